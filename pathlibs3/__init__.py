@@ -1,3 +1,8 @@
-import importlib.metadata
+def __getattr__(name):
+    # Resolved on access, importlib.metadata is slow to load at startup
+    if name == "__version__":
+        import importlib.metadata
 
-__version__ = importlib.metadata.version("pathlibs3")
+        return importlib.metadata.version("pathlibs3")
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
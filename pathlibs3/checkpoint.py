@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """Append-only journal used to resume a bulk job after a crash.
+
+    The journal records the last listed key whose page is fully processed,
+    the keys of the pages in flight and which of them are already done. It is
+    compacted each time the oldest page completes, and removed once the job
+    succeeds.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.after: Optional[str] = None
+        self.pages: list = []
+        self.done: set = set()
+        self._job: Optional[str] = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> list:
+        return [key for page in self.pages for key in page]
+
+    def open(self, job: str):
+        self._job = job
+        self.after = None
+        self.pages = []
+        self.done = set()
+        if self.path.exists():
+            self._load()
+            logger.info(
+                "Resuming %s after %s (%s keys in flight)",
+                job,
+                self.after,
+                len(self.pending) - len(self.done),
+            )
+        self._compact()
+
+        self._file = open(self.path, "a")
+
+    def _load(self):
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line may be truncated if the process died mid-write
+                    continue
+
+                if "job" in entry:
+                    if entry["job"] != self._job:
+                        raise ValueError(
+                            f"Checkpoint {self.path} belongs to {entry['job']}, "
+                            f"not to {self._job}"
+                        )
+                    self.after = entry.get("after")
+                elif "page" in entry:
+                    self.pages.append(entry["page"])
+                elif "done" in entry:
+                    self.done.add(entry["done"])
+
+    def _compact(self):
+        entries = [{"job": self._job, "after": self.after}]
+        entries += [{"page": page} for page in self.pages]
+        entries += [{"done": key} for key in sorted(self.done)]
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def begin(self, keys: list):
+        with self._lock:
+            self.pages.append(keys)
+            self._write({"page": keys})
+
+    def complete(self, key: str):
+        with self._lock:
+            self.done.add(key)
+            self._write({"done": key})
+
+    def advance(self):
+        """Mark the oldest page in flight as fully processed."""
+        with self._lock:
+            page = self.pages.pop(0)
+            self.after = page[-1]
+            self.done.difference_update(page)
+            self._file.close()
+            self._compact()
+            self._file = open(self.path, "a")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,26 @@
+SLOW_DOWN_CODES = {"SlowDown", "503", "ServiceUnavailable", "RequestLimitExceeded"}
+
+
+def client_error():
+    # botocore is heavy to import, only load it once a request failed
+    from botocore.exceptions import ClientError
+
+    return ClientError
+
+
+def is_slow_down(error: Exception) -> bool:
+    response = getattr(error, "response", {}) or {}
+    code = response.get("Error", {}).get("Code")
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in SLOW_DOWN_CODES or status == 503
+
+
+def is_missing(error: Exception) -> bool:
+    response = getattr(error, "response", {}) or {}
+    return response.get("Error", {}).get("Code") in {"NoSuchKey", "404"}
+
+
+def is_too_large(error: Exception) -> bool:
+    # CopyObject refuses sources over 5 GB with InvalidRequest
+    response = getattr(error, "response", {}) or {}
+    return response.get("Error", {}).get("Code") in {"InvalidRequest", "EntityTooLarge"}
@@ -1,12 +1,15 @@
-import boto3
 import logging
 from pathlib import Path
-import boto3.exceptions
-import botocore
-from typing import Union
-from botocore.exceptions import ClientError
+from typing import TYPE_CHECKING, Optional, Union
 
-logging.basicConfig(level=logging.INFO)
+from pathlibs3.checkpoint import Checkpoint
+from pathlibs3.errors import client_error, is_missing, is_too_large
+from pathlibs3.scheduler import RequestScheduler, get_default_scheduler
+
+if TYPE_CHECKING:
+    import boto3
+
+logger = logging.getLogger(__name__)
 
 
 def upload_file(
@@ -17,19 +20,19 @@ def upload_file(
         if not exists_ok:
             try:
                 client.head_object(Bucket=destination_bucket, Key=destination_path)
-            except botocore.exceptions.ClientError:
+            except client_error():
                 exist = False
         if exists_ok or exist is False:
             client.upload_file(str(source), destination_bucket, destination_path)
-    except ClientError as e:
+    except client_error() as e:
         if e.response["Error"]["Code"] == "FileExists":
-            logging.error(f"File {destination_path} already exist")
+            logger.error(f"File {destination_path} already exist")
         else:
             raise e
 
 
 class S3Path:
-    def __init__(self, client: boto3.client, bucket: str, path: Union[str, Path]):
+    def __init__(self, client: "boto3.client", bucket: str, path: Union[str, Path]):
         self.client = client
         self.bucket = bucket
         self.path = str(path)
@@ -68,7 +71,7 @@ class S3Path:
         return contents
 
     def iterdir(self, recursive: bool = False, only_files: bool = False):
-        logging.debug("looking for folder %s", self.path)
+        logger.debug("looking for folder %s", self.path)
         sub_folders = list()
 
         result = self.client.list_objects(
@@ -89,6 +92,90 @@ class S3Path:
         for subfolder in sub_folders:
             yield subfolder
 
+    def _iter_keys(
+        self,
+        start_after: Optional[str] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        page_size: int = 1000,
+    ):
+        scheduler = scheduler or get_default_scheduler()
+        prefix = self.path_dir
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix, "MaxKeys": page_size}
+        if start_after is not None:
+            kwargs["StartAfter"] = start_after
+
+        while True:
+            result = scheduler.call("list", self.client.list_objects_v2, **kwargs)
+            keys = [x["Key"] for x in result.get("Contents", []) if x["Key"] != prefix]
+            if keys:
+                yield keys
+            if not result.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = result["NextContinuationToken"]
+
+    def _check_not_inside(self, destination: "S3Path", operation: str):
+        # The listing is paginated while the job writes, keys written under
+        # the source would be listed and processed again
+        if self.bucket == destination.bucket and destination.path_dir.startswith(
+            self.path_dir
+        ):
+            raise ValueError(f"Cannot {operation} {self} into itself: {destination}")
+
+    def _run_bulk(
+        self,
+        job: str,
+        func,
+        scheduler: Optional[RequestScheduler] = None,
+        checkpoint: Union[Checkpoint, str, Path, None] = None,
+        missing_ok: bool = False,
+    ):
+        """Apply func to every key under this path, listed page by page.
+
+        With a checkpoint, progress is journaled and an interrupted job
+        restarts with the keys of its pages in flight, then lists from the
+        last of them with StartAfter. With missing_ok, in-flight keys that no
+        longer exist are considered processed.
+        """
+        scheduler = scheduler or get_default_scheduler()
+
+        if checkpoint is None:
+            scheduler.run_pages(func, self._iter_keys(scheduler=scheduler))
+            return
+
+        if not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint(checkpoint)
+
+        checkpoint.open(job)
+        resumed_pages = list(checkpoint.pages)
+        done = set(checkpoint.done)
+        resumed = set(checkpoint.pending) - done
+        start_after = resumed_pages[-1][-1] if resumed_pages else checkpoint.after
+
+        def pages():
+            for page in resumed_pages:
+                yield [x for x in page if x not in done]
+            for keys in self._iter_keys(start_after, scheduler):
+                checkpoint.begin(keys)
+                yield keys
+
+        def process(key: str):
+            try:
+                func(key)
+            except client_error() as e:
+                if not (missing_ok and key in resumed and is_missing(e)):
+                    raise
+                logger.info("%s no longer exists, already processed", key)
+            checkpoint.complete(key)
+
+        try:
+            scheduler.run_pages(
+                process, pages(), on_page_done=lambda page: checkpoint.advance()
+            )
+        finally:
+            checkpoint.close()
+
+        checkpoint.remove()
+
     def is_dir(self) -> bool:
         return self._is_dir()
 
@@ -99,7 +186,7 @@ class S3Path:
         try:
             result = self.client.head_object(Bucket=self.bucket, Key=self.path)
 
-        except ClientError:
+        except client_error():
             return True
 
         if (
@@ -123,7 +210,7 @@ class S3Path:
             try:
                 self.client.head_object(Bucket=self.bucket, Key=self.path)
                 return True
-            except ClientError as e:
+            except client_error() as e:
                 if e.response["Error"]["Code"] == "404":
                     return False
                 else:
@@ -145,28 +232,61 @@ class S3Path:
         )
 
     @classmethod
-    def _copy_from_s3_to_s3(cls, source: "S3Path", destination: "S3Path"):
-        logging.info("Copying from s3 to s3: %s to %s", source, destination)
+    def _copy_from_s3_to_s3(
+        cls,
+        source: "S3Path",
+        destination: "S3Path",
+        scheduler: Optional[RequestScheduler] = None,
+    ):
+        logger.info("Copying from s3 to s3: %s to %s", source, destination)
+        scheduler = scheduler or get_default_scheduler()
         client = source.client
         copy_source = {"Bucket": source.bucket, "Key": source.path}
-        client.copy(copy_source, destination.bucket, destination.path)
+        try:
+            scheduler.call(
+                "copy",
+                client.copy_object,
+                CopySource=copy_source,
+                Bucket=destination.bucket,
+                Key=destination.path,
+            )
+        except client_error() as e:
+            if not is_too_large(e):
+                raise
+
+            # Objects over 5 GB need a multipart copy, keep it on this thread so
+            # the scheduler still bounds concurrency
+            from boto3.s3.transfer import TransferConfig
+
+            scheduler.call(
+                "copy",
+                client.copy,
+                CopySource=copy_source,
+                Bucket=destination.bucket,
+                Key=destination.path,
+                Config=TransferConfig(use_threads=False),
+            )
 
     @classmethod
     def _copy_from_local_to_s3(cls, source: Path, destination: "S3Path"):
-        logging.info("Copying from local to s3: %s to %s", source, destination)
+        logger.info("Copying from local to s3: %s to %s", source, destination)
         client = destination.client
         upload_file(client, str(source), destination.bucket, destination.path)
 
     @classmethod
     def _copy_from_s3_to_local(cls, source: "S3Path", destination: Path):
-        logging.info("Copying from s3 to local: %s to %s", source, destination)
+        logger.info("Copying from s3 to local: %s to %s", source, destination)
         client = source.client
         with open(str(destination), "wb") as f:
             client.download_fileobj(source.bucket, source.path, f)
 
     @classmethod
     def copy(
-        cls, origin: Union["S3Path", Path, str], destination: Union["S3Path", Path, str]
+        cls,
+        origin: Union["S3Path", Path, str],
+        destination: Union["S3Path", Path, str],
+        scheduler: Optional[RequestScheduler] = None,
+        checkpoint: Union[Checkpoint, str, Path, None] = None,
     ):
         if isinstance(origin, str):
             origin = Path(origin)
@@ -174,14 +294,39 @@ class S3Path:
         if isinstance(destination, str):
             destination = Path(destination)
 
-        if origin.is_dir():
-            logging.info("%s is a directory", origin)
+        if checkpoint is not None and not (
+            isinstance(origin, S3Path) and isinstance(destination, S3Path)
+        ):
+            raise ValueError("checkpoint is only supported for copies from s3 to s3")
+
+        if (
+            isinstance(origin, S3Path)
+            and isinstance(destination, S3Path)
+            and origin.is_dir()
+        ):
+            logger.info("%s is a directory", origin)
+            origin._check_not_inside(destination, "copy")
+            prefix = origin.path_dir
+            origin._run_bulk(
+                f"copy s3://{origin.bucket}/{prefix} to "
+                f"s3://{destination.bucket}/{destination.path}",
+                lambda key: cls._copy_from_s3_to_s3(
+                    S3Path(origin.client, origin.bucket, key),
+                    destination / key[len(prefix) :],
+                    scheduler,
+                ),
+                scheduler,
+                checkpoint,
+            )
+
+        elif origin.is_dir():
+            logger.info("%s is a directory", origin)
             for path in origin.iterdir():
-                cls.copy(path, destination / path.name)
+                cls.copy(path, destination / path.name, scheduler)
 
         else:
             if isinstance(origin, S3Path) and isinstance(destination, S3Path):
-                cls._copy_from_s3_to_s3(origin, destination)
+                cls._copy_from_s3_to_s3(origin, destination, scheduler)
 
             if isinstance(origin, Path) and isinstance(destination, S3Path):
                 cls._copy_from_local_to_s3(origin, destination)
@@ -211,25 +356,59 @@ class S3Path:
             return None if not last_modified else max(last_modified)
 
 
-    def delete(self):
-        objects = self.iterdir(recursive=True, only_files=True)
+    def delete(
+        self,
+        scheduler: Optional[RequestScheduler] = None,
+        checkpoint: Union[Checkpoint, str, Path, None] = None,
+    ):
+        scheduler = scheduler or get_default_scheduler()
 
-        for object in objects:
-            logging.warning(f"Deleting {object.path}")
-            object.client.delete_object(Bucket=object.bucket, Key=object.path)
+        def delete_object(key: str):
+            logger.warning(f"Deleting {key}")
+            scheduler.call(
+                "delete", self.client.delete_object, Bucket=self.bucket, Key=key
+            )
+
+        self._run_bulk(
+            f"delete s3://{self.bucket}/{self.path_dir}",
+            delete_object,
+            scheduler,
+            checkpoint,
+        )
 
     @classmethod
-    def move(cls, source: "S3Path", destination: "S3Path"):
-        objects = source.iterdir(recursive=True, only_files=True)
+    def move(
+        cls,
+        source: "S3Path",
+        destination: "S3Path",
+        scheduler: Optional[RequestScheduler] = None,
+        checkpoint: Union[Checkpoint, str, Path, None] = None,
+    ):
+        source._check_not_inside(destination, "move")
+        scheduler = scheduler or get_default_scheduler()
 
-        for object in objects:
-            copy_source = {"Bucket": object.bucket, "Key": object.path}
+        def move_object(key: str):
+            copy_source = {"Bucket": source.bucket, "Key": key}
 
-            destination_path = object.path.replace(source.path, "")
+            destination_path = key.replace(source.path, "")
 
-            object.client.copy_object(
+            scheduler.call(
+                "copy",
+                source.client.copy_object,
                 CopySource=copy_source,
                 Bucket=destination.bucket,
                 Key=f"{destination.path}{destination_path}",
             )
-            object.client.delete_object(Bucket=object.bucket, Key=object.path)
+            scheduler.call(
+                "delete", source.client.delete_object, Bucket=source.bucket, Key=key
+            )
+
+        source._run_bulk(
+            f"move s3://{source.bucket}/{source.path_dir} to "
+            f"s3://{destination.bucket}/{destination.path}",
+            move_object,
+            scheduler,
+            checkpoint,
+            # Source keys are deleted once moved
+            missing_ok=True,
+        )
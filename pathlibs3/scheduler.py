@@ -0,0 +1,277 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Optional
+
+from pathlibs3.errors import client_error, is_slow_down
+
+logger = logging.getLogger(__name__)
+
+# S3 documented request rates per partitioned prefix (requests per second),
+# enforced here for each operation and each parent "directory" of a key
+DEFAULT_RATES = {
+    "copy": 3500,
+    "delete": 3500,
+    "list": 5500,
+}
+
+# Same default as boto3 managed transfers
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+def key_prefix(key: str) -> str:
+    return key.rpartition("/")[0]
+
+
+def retry_attempts(response) -> int:
+    """Number of retries botocore made before returning this response."""
+    if not isinstance(response, dict):
+        return 0
+    return response.get("ResponseMetadata", {}).get("RetryAttempts", 0) or 0
+
+
+class PrefixQueue:
+    """Queue handing out items round-robin across their parent prefixes.
+
+    Consecutive requests then draw on different token buckets of the
+    scheduler instead of queueing behind the rate limit of a single prefix.
+    """
+
+    def __init__(self, key: Callable = str):
+        self.key = key
+        self._groups = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, items: Iterable):
+        for item in items:
+            prefix = key_prefix(self.key(item))
+            self._groups.setdefault(prefix, deque()).append(item)
+            self._size += 1
+
+    def pop(self):
+        prefix, group = self._groups.popitem(last=False)
+        item = group.popleft()
+        if group:
+            self._groups[prefix] = group
+        self._size -= 1
+        return item
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RequestScheduler:
+    """Throttle-aware scheduler shared by the bulk operations of S3Path.
+
+    Every request goes through a token bucket for its operation type and the
+    parent prefix of its key, read from the boto3 Bucket and Key (or Prefix)
+    arguments, so spreading work across prefixes raises the total rate. The
+    number of requests in flight follows AIMD: it grows by one per window of
+    successful requests and is halved once per window in which S3 answers
+    with SlowDown.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: int = 1,
+        max_attempts: int = 8,
+        backoff: float = 0.1,
+    ):
+        self.rates = {**DEFAULT_RATES, **(rates or {})}
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._concurrency = float(max_concurrency)
+        self._in_flight = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+
+    @property
+    def concurrency(self) -> int:
+        return int(self._concurrency)
+
+    def _bucket(self, operation: str, kwargs: dict) -> Optional[TokenBucket]:
+        rate = self.rates.get(operation)
+        if rate is None:
+            return None
+
+        key = (
+            operation,
+            kwargs.get("Bucket"),
+            key_prefix(kwargs.get("Key", kwargs.get("Prefix", ""))),
+        )
+        with self._buckets_lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(rate)
+            return self._buckets[key]
+
+    def _acquire_slot(self) -> int:
+        with self._condition:
+            while self._in_flight >= int(self._concurrency):
+                self._condition.wait()
+            self._in_flight += 1
+            return self._epoch
+
+    def _release_slot(self, epoch: int, throttled: Optional[bool]):
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                # Requests sent before the last decrease saw the old window,
+                # their SlowDowns belong to the same congestion event
+                if epoch == self._epoch:
+                    self._concurrency = max(self.min_concurrency, self._concurrency / 2)
+                    self._epoch += 1
+            elif throttled is False:
+                self._concurrency = min(
+                    self.max_concurrency, self._concurrency + 1 / self._concurrency
+                )
+            self._condition.notify_all()
+
+    def call(self, operation: str, func: Callable, *args, **kwargs):
+        """Send one request, retrying it while S3 answers with SlowDown.
+
+        Retries already made by botocore count against max_attempts and mark
+        the request as throttled, so client retries do not stack on top of
+        ours.
+        """
+        bucket = self._bucket(operation, kwargs)
+        attempts = 0
+
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            epoch = self._acquire_slot()
+            throttled = None
+            try:
+                result = func(*args, **kwargs)
+                throttled = retry_attempts(result) > 0
+                return result
+            except client_error() as e:
+                retries = retry_attempts(e.response)
+                attempts += retries + 1
+                if not is_slow_down(e):
+                    throttled = retries > 0 or None
+                    raise
+                throttled = True
+                if attempts >= self.max_attempts:
+                    raise
+            finally:
+                self._release_slot(epoch, throttled)
+
+            delay = random.uniform(0, self.backoff * 2 ** (attempts - 1))
+            logger.debug(
+                "%s throttled, retrying in %.2fs (concurrency %s)",
+                operation,
+                delay,
+                self.concurrency,
+            )
+            time.sleep(delay)
+
+    def run_pages(
+        self,
+        func: Callable,
+        pages: Iterable[list],
+        on_page_done: Optional[Callable] = None,
+        key: Callable = str,
+    ):
+        """Apply func to every item of pages with a single pool of workers.
+
+        The next page is fetched in the background while the current ones
+        are processed, and items are dispatched round-robin across the
+        prefixes of every page in flight, so throughput does not drop at page
+        boundaries. on_page_done is called with each page, in order, once all
+        of its items are processed.
+        """
+        pages = iter(pages)
+        queue = PrefixQueue(lambda item: key(item[0]))
+        in_flight = deque()
+        futures = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency
+        ) as executor, ThreadPoolExecutor(max_workers=1) as lister:
+            next_page = lister.submit(next, pages, None)
+            try:
+                while True:
+                    # Take the next page once the queue runs low
+                    if (
+                        next_page is not None
+                        and next_page.done()
+                        and len(queue) <= self.max_concurrency
+                    ):
+                        page = next_page.result()
+                        if page is None:
+                            next_page = None
+                        else:
+                            next_page = lister.submit(next, pages, None)
+                            state = [page, len(page)]
+                            in_flight.append(state)
+                            queue.extend((item, state) for item in page)
+
+                    while queue and len(futures) < self.max_concurrency:
+                        item, state = queue.pop()
+                        futures[executor.submit(func, item)] = state
+
+                    while in_flight and in_flight[0][1] == 0:
+                        page, _ = in_flight.popleft()
+                        if on_page_done is not None:
+                            on_page_done(page)
+
+                    if next_page is None and not futures:
+                        return
+
+                    waiting = set(futures)
+                    if next_page is not None and len(queue) <= self.max_concurrency:
+                        waiting.add(next_page)
+                    done, _ = wait(waiting, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future is next_page:
+                            continue
+                        future.result()
+                        futures.pop(future)[1] -= 1
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+    return _default_scheduler
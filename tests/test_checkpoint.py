@@ -0,0 +1,176 @@
+import json
+import pytest
+from pathlibs3.checkpoint import Checkpoint
+from pathlibs3.pathlibs3 import S3Path
+
+
+def write_journal(path, entries):
+    with open(path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+class TestCheckpoint:
+    def test_journal(self, tmp_path):
+        journal = tmp_path / "job.journal"
+        checkpoint = Checkpoint(journal)
+        checkpoint.open("delete s3://bucket1/folder2/")
+        checkpoint.begin(["a", "b"])
+        checkpoint.complete("a")
+        checkpoint.close()
+
+        resumed = Checkpoint(journal)
+        resumed.open("delete s3://bucket1/folder2/")
+        assert resumed.after is None
+        assert resumed.pending == ["a", "b"]
+        assert resumed.done == {"a"}
+
+        resumed.advance()
+        resumed.close()
+        with open(journal) as f:
+            assert [json.loads(line) for line in f] == [
+                {"job": "delete s3://bucket1/folder2/", "after": "b"}
+            ]
+
+    def test_pages_in_flight(self, tmp_path):
+        journal = tmp_path / "job.journal"
+        checkpoint = Checkpoint(journal)
+        checkpoint.open("job")
+        checkpoint.begin(["a", "b"])
+        checkpoint.begin(["c", "d"])
+        checkpoint.complete("c")
+        checkpoint.complete("b")
+        checkpoint.complete("a")
+        checkpoint.advance()
+        checkpoint.close()
+
+        resumed = Checkpoint(journal)
+        resumed.open("job")
+        resumed.close()
+
+        assert resumed.after == "b"
+        assert resumed.pages == [["c", "d"]]
+        assert resumed.done == {"c"}
+
+    def test_truncated_line(self, tmp_path):
+        journal = tmp_path / "job.journal"
+        write_journal(journal, [{"job": "job", "after": "a"}, {"page": ["b", "c"]}])
+        with open(journal, "a") as f:
+            f.write('{"done": "')
+
+        checkpoint = Checkpoint(journal)
+        checkpoint.open("job")
+        checkpoint.close()
+
+        assert checkpoint.after == "a"
+        assert checkpoint.pending == ["b", "c"]
+        assert checkpoint.done == set()
+
+    def test_other_job(self, tmp_path):
+        journal = tmp_path / "job.journal"
+        write_journal(journal, [{"job": "job", "after": None}])
+
+        with pytest.raises(ValueError):
+            Checkpoint(journal).open("another job")
+
+    def test_resume_in_flight_page(self, setup_bucket, bucket, tmp_path):
+        client = setup_bucket
+        source = S3Path(client, bucket=bucket, path="folder2/")
+        destination = S3Path(client, bucket=bucket, path="folder4/")
+        journal = tmp_path / "copy.journal"
+        write_journal(
+            journal,
+            [
+                {"job": "copy s3://bucket1/folder2/ to s3://bucket1/folder4/"},
+                {"page": ["folder2/folder1-1/test2.txt", "folder2/test3.txt"]},
+                {"done": "folder2/test3.txt"},
+            ],
+        )
+
+        S3Path.copy(source, destination, checkpoint=journal)
+
+        # Done keys are trusted and not copied again
+        assert S3Path(client, bucket, "folder4/folder1-1/test2.txt").exists()
+        assert not S3Path(client, bucket, "folder4/test3.txt").exists()
+        assert not journal.exists()
+
+    def test_resume_after_last_key(self, setup_bucket, bucket, tmp_path):
+        client = setup_bucket
+        source = S3Path(client, bucket=bucket, path="folder2/")
+        journal = tmp_path / "delete.journal"
+        write_journal(
+            journal,
+            [
+                {
+                    "job": "delete s3://bucket1/folder2/",
+                    "after": "folder2/folder1-1/test2.txt",
+                }
+            ],
+        )
+
+        source.delete(checkpoint=journal)
+
+        assert S3Path(client, bucket, "folder2/folder1-1/test2.txt").exists()
+        assert not S3Path(client, bucket, "folder2/test3.txt").exists()
+        assert not journal.exists()
+
+    def test_resume_move_after_delete(self, setup_bucket, bucket, tmp_path):
+        client = setup_bucket
+        source = S3Path(client, bucket=bucket, path="folder2/")
+        destination = S3Path(client, bucket=bucket, path="new_folder/")
+        journal = tmp_path / "move.journal"
+        write_journal(
+            journal,
+            [
+                {"job": "move s3://bucket1/folder2/ to s3://bucket1/new_folder/"},
+                {"page": ["folder2/folder1-1/test2.txt", "folder2/test3.txt"]},
+            ],
+        )
+        # Crash after the key was copied and deleted, before it was journaled
+        client.copy_object(
+            CopySource={"Bucket": bucket, "Key": "folder2/test3.txt"},
+            Bucket=bucket,
+            Key="new_folder/test3.txt",
+        )
+        client.delete_object(Bucket=bucket, Key="folder2/test3.txt")
+
+        S3Path.move(source, destination, checkpoint=journal)
+
+        assert list(source.iterdir(recursive=True)) == []
+        assert S3Path(client, bucket, "new_folder/test3.txt").exists()
+        assert S3Path(client, bucket, "new_folder/folder1-1/test2.txt").exists()
+        assert not journal.exists()
+
+    def test_reuse_checkpoint(self, setup_bucket, bucket, tmp_path):
+        client = setup_bucket
+        checkpoint = Checkpoint(tmp_path / "delete.journal")
+
+        S3Path(client, bucket=bucket, path="folder2/").delete(checkpoint=checkpoint)
+        S3Path(client, bucket=bucket, path="folder1/").delete(checkpoint=checkpoint)
+
+        assert not S3Path(client, bucket, "folder1/test.txt").exists()
+
+    def test_local_copy_with_checkpoint(self, setup_bucket, bucket, tmp_path):
+        client = setup_bucket
+        source = S3Path(client, bucket=bucket, path="folder2/")
+        journal = tmp_path / "copy.journal"
+
+        with pytest.raises(ValueError):
+            S3Path.copy(source, tmp_path / "local", checkpoint=journal)
+
+        with pytest.raises(ValueError):
+            S3Path.copy(tmp_path, source, checkpoint=journal)
+
+        assert not journal.exists()
+
+    def test_move_with_checkpoint(self, setup_bucket, bucket, tmp_path):
+        client = setup_bucket
+        source = S3Path(client, bucket=bucket, path="folder2/")
+        destination = S3Path(client, bucket=bucket, path="new_folder/")
+        journal = tmp_path / "move.journal"
+
+        S3Path.move(source, destination, checkpoint=journal)
+
+        assert list(source.iterdir(recursive=True)) == []
+        assert len(list(destination.iterdir(recursive=True, only_files=True))) == 2
+        assert not journal.exists()
@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+
+# Seconds allowed to import pathlibs3.pathlibs3, boto3 alone takes several times this
+IMPORT_TIME_BUDGET = 0.1
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+from pathlibs3.pathlibs3 import S3Path
+elapsed = time.perf_counter() - start
+import json, sys
+path = S3Path(None, "bucket1", "folder1/folder2/test.txt")
+print(json.dumps({
+    "elapsed": elapsed,
+    "modules": [x for x in ("boto3", "botocore") if x in sys.modules],
+    "path": (path / "other.txt").path,
+    "name": path.name,
+    "parent": path.parent.path,
+    "parents": [x.path for x in path.parents],
+}))
+"""
+
+
+def run_script():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_path_operations_without_boto3():
+    result = run_script()
+
+    assert result["modules"] == []
+    assert result["path"] == "folder1/folder2/test.txt/other.txt"
+    assert result["name"] == "test.txt"
+    assert result["parent"] == "folder1/folder2"
+    assert result["parents"] == ["folder1/folder2", "folder1"]
+
+
+def test_import_time_budget():
+    # Best of a few runs to absorb noise from a busy machine
+    elapsed = min(run_script()["elapsed"] for _ in range(3))
+
+    assert elapsed < IMPORT_TIME_BUDGET
@@ -1,5 +1,6 @@
 import pytest
 import boto3
+from botocore.exceptions import ClientError
 from pathlibs3.pathlibs3 import S3Path, upload_file
 from pathlib import Path
 import datetime
@@ -375,3 +376,52 @@ class TestS3Path:
             for x in destination_folder_after
         ]
         assert contents_before == contents_after
+
+    def test_copy_file_over_5gb(self, setup_bucket, bucket, monkeypatch):
+        client = setup_bucket
+        real_copy_object = client.copy_object
+        real_copy = client.copy
+        copy_object_calls = []
+        copy_configs = []
+
+        def copy_object(**kwargs):
+            copy_object_calls.append(kwargs)
+            if len(copy_object_calls) == 1:
+                raise ClientError({"Error": {"Code": "InvalidRequest"}}, "CopyObject")
+            return real_copy_object(**kwargs)
+
+        def copy(**kwargs):
+            copy_configs.append(kwargs["Config"])
+            return real_copy(**kwargs)
+
+        monkeypatch.setattr(client, "copy_object", copy_object)
+        monkeypatch.setattr(client, "copy", copy)
+
+        S3Path.copy(
+            S3Path(client, bucket=bucket, path="folder1/test.txt"),
+            S3Path(client, bucket=bucket, path="folder3/test.txt"),
+        )
+
+        # Managed transfer only as a fallback, without its own thread pool
+        assert len(copy_configs) == 1
+        assert copy_configs[0].use_threads is False
+        assert S3Path(client, bucket=bucket, path="folder3/test.txt").exists()
+
+    def test_copy_and_move_into_itself(self, setup_bucket, bucket):
+        client = setup_bucket
+        source_folder = S3Path(client, bucket=bucket, path="folder2/")
+        objects_before = [x.path for x in source_folder.iterdir(recursive=True)]
+
+        for destination in ["folder2/", "folder2/sub/", "folder2/sub"]:
+            destination_folder = S3Path(client, bucket=bucket, path=destination)
+            with pytest.raises(ValueError):
+                S3Path.copy(source_folder, destination_folder)
+            with pytest.raises(ValueError):
+                S3Path.move(source_folder, destination_folder)
+
+        objects_after = [x.path for x in source_folder.iterdir(recursive=True)]
+        assert objects_before == objects_after
+
+        # A sibling sharing the name as prefix is fine
+        S3Path.copy(source_folder, S3Path(client, bucket=bucket, path="folder2-copy/"))
+        assert S3Path(client, bucket=bucket, path="folder2-copy/test3.txt").exists()
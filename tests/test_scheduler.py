@@ -0,0 +1,201 @@
+import threading
+import time
+import pytest
+from botocore.exceptions import ClientError
+from pathlibs3.pathlibs3 import S3Path
+from pathlibs3.scheduler import PrefixQueue, RequestScheduler, TokenBucket
+
+
+def slow_down_error(retry_attempts=0):
+    return ClientError(
+        {
+            "Error": {"Code": "SlowDown", "Message": "Please reduce your request rate."},
+            "ResponseMetadata": {
+                "HTTPStatusCode": 503,
+                "RetryAttempts": retry_attempts,
+            },
+        },
+        "DeleteObject",
+    )
+
+
+def test_prefix_queue():
+    queue = PrefixQueue()
+    queue.extend(["a/1", "a/2", "a/3", "b/1"])
+
+    assert [queue.pop(), queue.pop()] == ["a/1", "b/1"]
+
+    # Items added later are interleaved with the ones left
+    queue.extend(["b/2", "c/1"])
+
+    assert len(queue) == 4
+    assert [queue.pop() for _ in range(4)] == ["a/2", "b/2", "c/1", "a/3"]
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    # First token is available immediately, the 5 next wait 10ms each
+    assert time.monotonic() - start >= 0.045
+
+
+class TestRequestScheduler:
+    def test_retry_on_slow_down(self):
+        scheduler = RequestScheduler(max_concurrency=8, backoff=0)
+        calls = []
+
+        def request():
+            calls.append(1)
+            if len(calls) < 3:
+                raise slow_down_error()
+            return "done"
+
+        assert scheduler.call("delete", request) == "done"
+        assert len(calls) == 3
+        # Halved twice, then one additive increase
+        assert scheduler.concurrency == 2
+
+    def test_give_up_after_max_attempts(self):
+        scheduler = RequestScheduler(max_concurrency=8, max_attempts=2, backoff=0)
+
+        def request():
+            raise slow_down_error()
+
+        with pytest.raises(ClientError):
+            scheduler.call("delete", request)
+
+        # The last SlowDown also lowers concurrency
+        assert scheduler.concurrency == 2
+
+    def test_client_retries_count_as_attempts(self):
+        scheduler = RequestScheduler(max_concurrency=64, max_attempts=5, backoff=0)
+        calls = []
+
+        def request():
+            calls.append(1)
+            # botocore already sent the request 5 times
+            raise slow_down_error(retry_attempts=4)
+
+        with pytest.raises(ClientError):
+            scheduler.call("delete", request)
+
+        assert len(calls) == 1
+        # A single congestion event, whatever the number of client retries
+        assert scheduler.concurrency == 32
+
+    def test_client_retries_on_success_are_throttle_events(self):
+        scheduler = RequestScheduler(max_concurrency=8)
+
+        result = scheduler.call(
+            "delete", lambda: {"ResponseMetadata": {"RetryAttempts": 2}}
+        )
+
+        assert result == {"ResponseMetadata": {"RetryAttempts": 2}}
+        assert scheduler.concurrency == 4
+
+    def test_concurrent_slow_downs_halve_once(self):
+        scheduler = RequestScheduler(max_concurrency=32, backoff=0)
+        barrier = threading.Barrier(16)
+        throttled = set()
+        lock = threading.Lock()
+
+        def request(i):
+            with lock:
+                first_attempt = i not in throttled
+                throttled.add(i)
+            if first_attempt:
+                # Every request is in flight before any SlowDown comes back
+                barrier.wait()
+                raise slow_down_error()
+
+        threads = [
+            threading.Thread(target=scheduler.call, args=("delete", request, i))
+            for i in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Halved once to 16, the 16 successful retries then add just under one
+        assert scheduler.concurrency == 16
+
+    def test_other_errors_are_not_retried(self):
+        scheduler = RequestScheduler(max_concurrency=4, backoff=0)
+        calls = []
+
+        def request():
+            calls.append(1)
+            raise ClientError({"Error": {"Code": "AccessDenied"}}, "DeleteObject")
+
+        with pytest.raises(ClientError):
+            scheduler.call("delete", request)
+
+        assert len(calls) == 1
+        assert scheduler.concurrency == 4
+
+    def test_rate_limit_per_prefix(self):
+        scheduler = RequestScheduler(rates={"delete": 10})
+        for _ in range(10):
+            scheduler.call("delete", lambda **kwargs: None, Bucket="b", Key="a/1")
+
+        # Bucket of prefix "a" is empty, the one of prefix "b" is not
+        start = time.monotonic()
+        scheduler.call("delete", lambda **kwargs: None, Bucket="b", Key="b/1")
+        assert time.monotonic() - start < 0.05
+
+        start = time.monotonic()
+        scheduler.call("delete", lambda **kwargs: None, Bucket="b", Key="a/2")
+        assert time.monotonic() - start >= 0.05
+
+    def test_run_pages(self):
+        scheduler = RequestScheduler(max_concurrency=4)
+        pages = [[f"a/{i}" for i in range(10)], ["b/1", "c/1"], ["c/2"]]
+        processed = []
+        pages_done = []
+
+        scheduler.run_pages(processed.append, pages, on_page_done=pages_done.append)
+
+        assert sorted(processed) == sorted(key for page in pages for key in page)
+        assert pages_done == pages
+
+    def test_run_pages_error(self):
+        scheduler = RequestScheduler(max_concurrency=2)
+        pages_done = []
+
+        def process(key):
+            if key == "b/1":
+                raise ValueError(key)
+
+        with pytest.raises(ValueError):
+            scheduler.run_pages(
+                process, [["a/1"], ["b/1"], ["c/1"]], on_page_done=pages_done.append
+            )
+
+        assert ["b/1"] not in pages_done
+
+    def test_move_with_scheduler(self, setup_bucket, bucket):
+        client = setup_bucket
+        scheduler = RequestScheduler(max_concurrency=2)
+        source_folder = S3Path(client, bucket=bucket, path="folder2/")
+        destination_folder = S3Path(client, bucket=bucket, path="new_folder/")
+
+        S3Path.move(source_folder, destination_folder, scheduler=scheduler)
+
+        assert list(source_folder.iterdir(recursive=True)) == []
+        assert set(
+            x.path for x in destination_folder.iterdir(recursive=True, only_files=True)
+        ) == {"new_folder/test3.txt", "new_folder/folder1-1/test2.txt"}
+
+    def test_delete_with_scheduler(self, setup_bucket, bucket):
+        client = setup_bucket
+        scheduler = RequestScheduler(max_concurrency=2)
+        navigator = S3Path(client, bucket=bucket, path="folder2/")
+
+        navigator.delete(scheduler=scheduler)
+
+        assert list(navigator.iterdir(recursive=True)) == []